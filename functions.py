@@ -1,20 +1,17 @@
-import ast
-import colorsys
-import math
+import functools
+import io
 import os
 import re
-from collections import Counter
 from urllib.parse import urljoin
 
+import aiohttp
 import cv2
 import numpy as np
-import pandas as pd
-import requests
 import webcolors
 from PIL import Image
-from bs4 import BeautifulSoup
-from colorthief import ColorThief
-from sklearn.cluster import KMeans
+from matplotlib.colors import rgb_to_hsv
+from scipy.spatial import cKDTree
+from selectolax.lexbor import LexborHTMLParser
 
 BROAD_COLORS = {
     "Red": (220, 20, 60),
@@ -36,157 +33,281 @@ COLOR_WARMTH = {
     "Black": 0,
 }
 
+MAX_CLUSTER_PIXELS = 50_000  # Pixels sampled from each logo before clustering
+
+# Broad color palette as an array, so nearest-color lookups run in a single NumPy call.
+# int32 keeps the squared channel differences (up to 255 ** 2 * 3) from overflowing.
+_BROAD_NAMES = list(BROAD_COLORS.keys())
+_BROAD_RGB = np.array(list(BROAD_COLORS.values()), dtype=np.int32)
+_BROAD_WARMTH = np.array([COLOR_WARMTH[name] for name in _BROAD_NAMES])
+
+# W3C color names indexed in a KD-tree, built once instead of on every lookup.
+# Names sharing an RGB value (gray/grey) keep the first one, as the list-ordered min() did.
+_W3C_COLORS = {}
+for _name in webcolors.names():
+    _W3C_COLORS.setdefault(tuple(webcolors.name_to_rgb(_name)), _name)
+_W3C_NAMES = list(_W3C_COLORS.values())
+_W3C_RGB = np.array(list(_W3C_COLORS.keys()), dtype=np.int16)
+_W3C_TREE = cKDTree(_W3C_RGB)
+_W3C_MAX_TIES = 4  # No RGB value is equally close to more than four W3C colors
+
 # Helper functions for logo download and duplicate removal
 
+MAX_CONCURRENT_DOWNLOADS = 200  # Sites fetched at the same time by download_logos
+
+_BRAND_SPLIT = re.compile(r"[-_.]")
+
 def extract_brand(domain):
-    domain = domain.split(".")[0]  # Remove TLD (.com, .net, etc.)
-    words = re.split(r"[-_]", domain)  # Split by dashes or underscores
-    return words[0]  # Take the first part as the assumed brand
+    # Everything before the first dot (TLD), dash or underscore is the assumed brand
+    return _BRAND_SPLIT.split(domain, 1)[0]
 
-def get_logo_url(domain):
+def create_download_session():
+    """Creates the HTTP session shared by all downloads, pooling connections and caching DNS lookups"""
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_DOWNLOADS, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=15))
+
+async def get_logo_url(session, domain):
     """Try to extract a logo from the website"""
     url = f"https://{domain}" # Try HTTPS by default
     try:
-        response = requests.get(url, timeout=20)
-        if response.status_code != 200:
-            return None # Skip if site is down
+        async with session.get(url) as response:
+            if response.status != 200:
+                return None # Skip if site is down
+            html = await response.text(errors="replace")
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        tree = LexborHTMLParser(html)
 
-        logo_tags = soup.find_all("img")
-        for tag in logo_tags:
-            src = tag.get("src", "")
-            if "logo" in src.lower():  # Look for 'logo' in filename
-                return urljoin(url, src)
+        # Look for 'logo' in filename, matched case-insensitively by the selector itself
+        logo_tag = tree.css_first('img[src*="logo" i]')
+        if logo_tag:
+            return urljoin(url, logo_tag.attributes.get("src") or "")
 
-        icon_link = soup.find("link", rel="icon")
+        icon_link = tree.css_first('link[rel~="icon"][href]')
         if icon_link:
-            return urljoin(url, icon_link["href"])
+            return urljoin(url, icon_link.attributes.get("href") or "")
 
-        favicon = urljoin(url, icon_link["href"])
-        return favicon
+        return None # No logo found
     except Exception as e:
-        return e
+        return None
 
-def download_logo(domain):
-    """Download a logo from the website"""
-    output_folder = "logos"
-    os.makedirs(output_folder, exist_ok=True)
-    logo_url = get_logo_url(domain)
+async def download_logo_bytes(session, domain):
+    """Download a logo from the website and return its raw bytes, or None if it failed"""
+    logo_url = await get_logo_url(session, domain)
     if logo_url:
         try:
-            response = requests.get(logo_url, stream=True, timeout=5)
-            if response.status_code == 200:
-                file = os.path.join(output_folder, f"{domain.split(".")[0]}.png")
-                with open(file, "wb") as file:
-                    for chunk in response.iter_content(1024):
-                        file.write(chunk)
-                print(f"Downloaded: {file}")
+            async with session.get(logo_url) as response:
+                if response.status == 200:
+                    return await response.read()
         except Exception as e:
             print(f"Failed to download {logo_url}: {e}")
+    return None
+
+def hash_logo_bytes(data):
+    """Decodes a downloaded logo and returns its perceptual hash, or None if it is not a valid image"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            return dhash(img)
+    except Exception:
+        return None
 
 def dhash(image, hash_size = 8):
-    """Compute perceptual hash for an image"""
+    """Compute perceptual hash for an image, packed into an integer (64 bits for the default size)"""
     image = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
-    diff = [image.getpixel((x, y)) > image.getpixel((x + 1, y)) for y in range(hash_size) for x in range(hash_size)]
-    return "".join(["1" if d else "0" for d in diff])
+    pixels = np.asarray(image, dtype=np.uint8)
+    diff = pixels[:, :-1] > pixels[:, 1:]  # Compare each pixel with its right neighbour
+    return int.from_bytes(np.packbits(diff.reshape(-1)).tobytes(), "big")
+
+def hamming_distance(hash1, hash2):
+    """Counts the bits that differ between two integer image hashes"""
+    return (hash1 ^ hash2).bit_count()
 
 def calculate_histogram_similarity(image1, image2):
     """Calculate histogram similarity between two images"""
-    img1 = cv2.imread(image1)
-    img2 = cv2.imread(image2)
+    similarity = cv2.compareHist(_hsv_histogram(image1), _hsv_histogram(image2), cv2.HISTCMP_CORREL)
+    return (similarity + 1) / 2 * 100
 
-    # Check if images loaded successfully
-    if img1 is None:
-        raise FileNotFoundError(f"Error: Could not load image at {img1}")
-    if img2 is None:
-        raise FileNotFoundError(f"Error: Could not load image at {img2}")
+@functools.lru_cache(maxsize=None)
+def _hsv_histogram(image_path):
+    """Computes the normalized HSV histogram of an image once, it is reused for every comparison"""
+    img = cv2.imread(image_path)
 
-    img1_hsv = cv2.cvtColor(img1, cv2.COLOR_BGR2HSV)
-    img2_hsv = cv2.cvtColor(img2, cv2.COLOR_BGR2HSV)
+    # Check if image loaded successfully
+    if img is None:
+        raise FileNotFoundError(f"Error: Could not load image at {image_path}")
 
-    # Compute histograms for each channel (H, S, V)
-    hist1 = cv2.calcHist([img1_hsv], [0, 1, 2], None, [50, 60, 60], [0, 180, 0, 256, 0, 256])
-    hist2 = cv2.calcHist([img2_hsv], [0, 1, 2], None, [50, 60, 60], [0, 180, 0, 256, 0, 256])
+    img_hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
 
-    hist1 = cv2.normalize(hist1, hist1, 0, 255, cv2.NORM_MINMAX).flatten()
-    hist2 = cv2.normalize(hist2, hist2, 0, 255, cv2.NORM_MINMAX).flatten()
-
-    similarity = cv2.compareHist(hist1, hist2, cv2.HISTCMP_CORREL)
-    return (similarity + 1) / 2 * 100
+    # Compute histogram over the three channels (H, S, V)
+    hist = cv2.calcHist([img_hsv], [0, 1, 2], None, [16, 16, 16], [0, 180, 0, 256, 0, 256])
+    return cv2.normalize(hist, hist, 0, 255, cv2.NORM_MINMAX).flatten()
 
 # Helper functions for main color analysis
 
-def get_main_color(image_path):
-    """Extracts the dominant color from an image using ColorThief."""
+def get_main_color(image_path, quality=6):
+    """Extracts the dominant color from an image, the first color of ColorThief's median cut palette."""
     try:
-        color_thief = ColorThief(image_path)
-        dominant_color = color_thief.get_color(quality=6)  # Adjust quality (lower = faster)
-        return dominant_color
+        with Image.open(image_path) as img:
+            pixels = np.asarray(img.convert("RGBA")).reshape(-1, 4)[::quality]  # Lower quality = more pixels
+
+        # Ignore transparent and almost white pixels, as ColorThief does
+        pixels = pixels[(pixels[:, 3] >= 125) & ~(pixels[:, :3] > 250).all(axis=1), :3]
+        return _median_cut_main_color(pixels)
     except Exception as e:
         return None
 
+# Modified median cut quantization (MMCQ), the algorithm behind ColorThief. The pixels are
+# counted once into a 32x32x32 histogram, so every box operation is a NumPy slice instead of
+# a Python loop over colors. Boxes are (r1, r2, g1, g2, b1, b2) tuples of inclusive bin ranges.
+
+_MMCQ_MAX_ITERATION = 1000
+
+def _median_cut_main_color(pixels, max_colors=5):
+    """Returns the first color of the ColorThief palette of max_colors colors for (N, 3) RGB pixels."""
+    if not len(pixels):
+        raise ValueError("Empty pixels when quantize.")
+
+    bins = pixels.astype(np.int64) >> 3
+    histo = np.bincount((bins[:, 0] << 10) + (bins[:, 1] << 5) + bins[:, 2], minlength=32 ** 3).reshape(32, 32, 32)
+    lows, highs = bins.min(axis=0), bins.max(axis=0)
+    queue = [(int(lows[0]), int(highs[0]), int(lows[1]), int(highs[1]), int(lows[2]), int(highs[2]))]
+
+    # First set of colors sorted by population, the rest by population times box volume
+    by_count = lambda box: _box_count(histo, box)
+    by_count_volume = lambda box: _box_count(histo, box) * _box_volume(box)
+    _median_cut_iterate(histo, queue, by_count, 0.75 * max_colors)
+    _median_cut_iterate(histo, queue, by_count_volume, max_colors - len(queue))
+
+    queue.sort(key=by_count_volume)
+    return _box_average(histo, queue[-1])
+
+def _median_cut_iterate(histo, queue, sort_key, target):
+    """Splits the largest box of the queue (by sort_key) until target colors were produced."""
+    n_colors = 1
+    for _ in range(_MMCQ_MAX_ITERATION):
+        # A stable sort followed by pop() matches ColorThief's priority queue, ties included
+        queue.sort(key=sort_key)
+        box = queue.pop()
+        if not _box_count(histo, box):
+            queue.append(box)
+            continue
+
+        box1, box2 = _median_cut_apply(histo, box)
+        queue.append(box1)
+        if box2:
+            queue.append(box2)
+            n_colors += 1
+        if n_colors >= target:
+            return
+
+def _box_count(histo, box):
+    r1, r2, g1, g2, b1, b2 = box
+    return int(histo[r1:r2 + 1, g1:g2 + 1, b1:b2 + 1].sum())
+
+def _box_volume(box):
+    r1, r2, g1, g2, b1, b2 = box
+    return (r2 - r1 + 1) * (g2 - g1 + 1) * (b2 - b1 + 1)
+
+def _box_average(histo, box):
+    """Average color of the pixels in a box, or its center when it is empty."""
+    r1, r2, g1, g2, b1, b2 = box
+    sub_histo = histo[r1:r2 + 1, g1:g2 + 1, b1:b2 + 1]
+    total = int(sub_histo.sum())
+    if not total:
+        return tuple(int(8 * (low + high + 1) / 2) for low, high in ((r1, r2), (g1, g2), (b1, b2)))
+
+    # Each bin stands for the color at its center, (bin + 0.5) * 8; the sums are exact integers
+    average = []
+    for axis, low, high in ((0, r1, r2), (1, g1, g2), (2, b1, b2)):
+        other_axes = tuple(a for a in range(3) if a != axis)
+        centers = 8 * np.arange(low, high + 1, dtype=np.int64) + 4
+        average.append(int(int((sub_histo.sum(axis=other_axes) * centers).sum()) / total))
+    return tuple(average)
+
+def _median_cut_apply(histo, box):
+    """Cuts a box in two along its widest side, at the median of its pixels."""
+    if _box_count(histo, box) == 1:
+        return box, None
+
+    # The widest side is cut, preferring red, then green, then blue on ties
+    widths = [box[1] - box[0] + 1, box[3] - box[2] + 1, box[5] - box[4] + 1]
+    axis = widths.index(max(widths))
+    low, high = box[2 * axis], box[2 * axis + 1]
+
+    r1, r2, g1, g2, b1, b2 = box
+    other_axes = tuple(a for a in range(3) if a != axis)
+    slice_sums = histo[r1:r2 + 1, g1:g2 + 1, b1:b2 + 1].sum(axis=other_axes)
+    partial_sum = dict(zip(range(low, high + 1), np.cumsum(slice_sums).tolist()))
+    total = partial_sum[high]
+    look_ahead_sum = {i: total - value for i, value in partial_sum.items()}
+
+    for i in range(low, high + 1):
+        if partial_sum[i] > total / 2:
+            left = i - low
+            right = high - i
+            if left <= right:
+                cut = min(high - 1, int(i + right / 2))
+            else:
+                cut = max(low, int(i - 1 - left / 2))
+
+            # Avoid boxes without pixels
+            while not partial_sum.get(cut, False):
+                cut += 1
+            count2 = look_ahead_sum.get(cut)
+            while not count2 and partial_sum.get(cut - 1, False):
+                cut -= 1
+                count2 = look_ahead_sum.get(cut)
+
+            box1, box2 = list(box), list(box)
+            box1[2 * axis + 1] = cut
+            box2[2 * axis] = cut + 1
+            return tuple(box1), tuple(box2)
+    raise ValueError("Box could not be cut.")
+
 def closest_colour(requested_colour):
     """Finds the closest color from the W3C color names using RGB distance."""
-    distances = {}
-    for name in webcolors.names():
-        r_c, g_c, b_c = webcolors.name_to_rgb(name)
-        rd = (r_c - requested_colour[0]) ** 2
-        gd = (g_c - requested_colour[1]) ** 2
-        bd = (b_c - requested_colour[2]) ** 2
-        distances[name] = rd + gd + bd
-    return min(distances, key=distances.get)
-
-def closest_broad_color(rgb):
-    """Finds the closest broad color to the given RGB value using Euclidean distance."""
-    min_distance = float("inf")
-    closest_color = None
+    return closest_colours_batch([requested_colour])[0]
 
-    for color_name, color_rgb in BROAD_COLORS.items():
-        distance = np.sqrt(sum((rgb[i] - color_rgb[i]) ** 2 for i in range(3)))
-        if distance < min_distance:
-            min_distance = distance
-            closest_color = color_name
+def closest_colours_batch(requested_colours):
+    """Finds the closest W3C color name for each row of an (N, 3) array in a single tree query."""
+    distances, indices = _W3C_TREE.query(np.asarray(requested_colours).reshape(-1, 3), k=_W3C_MAX_TIES)
 
-    return closest_color
+    # Equally close colors resolve to the first name in list order, as the list-ordered min() did
+    indices = np.where(distances == distances[:, :1], indices, len(_W3C_NAMES)).min(axis=1)
+    return [_W3C_NAMES[i] for i in indices]
 
-def get_colour_name(requested_colour):
-    """Returns actual color name if found, otherwise returns closest match."""
-    try:
-        actual_name = webcolors.rgb_to_name(requested_colour)
-    except ValueError:
-        actual_name = None
-    closest_name = closest_colour(requested_colour)
-    return actual_name, closest_name
+def closest_broad_color(rgb):
+    """Finds the closest broad color to the given RGB value using Euclidean distance."""
+    distances = ((_BROAD_RGB - np.asarray(rgb, dtype=np.int32)) ** 2).sum(axis=1)
+    return _BROAD_NAMES[int(np.argmin(distances))]
 
-def display_color_analysis(csv_path, output_file="color_analysis.md"):
-    """Groups logos by their closest broad color and saves results in a Markdown file."""
-    csv_file = pd.read_csv(csv_path)
+def closest_broad_color_batch(rgbs):
+    """Returns the index (into the broad color names) of the closest broad color for each row of an (N, 3) array."""
+    rgbs = np.asarray(rgbs, dtype=np.int32).reshape(-1, 3)
+    distances = ((rgbs[:, None, :] - _BROAD_RGB[None, :, :]) ** 2).sum(axis=-1)
+    return distances.argmin(axis=1)
 
-    # Dictionary to store grouped logos
-    color_groups = {color: [] for color in BROAD_COLORS.keys()}
+def write_color_analysis(logos, rgbs, output_file="color_analysis.md"):
+    """Groups logos by the closest broad color of their (N, 3) RGB main colors and saves results in a Markdown file."""
+    # Dictionary to store grouped logos, keeping every category even when it is empty
+    color_groups = {color: [] for color in _BROAD_NAMES}
 
-    for logo, rgb_str in zip(csv_file["Logo"], csv_file["Main_Color_RGB"]):
-        try:
-            rgb_tuple = ast.literal_eval(rgb_str)  # Convert "(R, G, B)" string to tuple
-            broad_color = closest_broad_color(rgb_tuple)
-            color_groups[broad_color].append(logo)
-        except Exception as e:
-            pass
+    # All main colors are matched to a broad color in a single NumPy call
+    for logo, color_index in zip(logos, closest_broad_color_batch(rgbs)):
+        color_groups[_BROAD_NAMES[color_index]].append(logo)
 
     # Generate Markdown content
+    lines = ["# Logo Main Color Analysis\n\n",
+             "This document groups logos by their closest broad color category.\n\n"]
+    for color, color_logos in color_groups.items():
+        lines.append(f"## {color.capitalize()} Logos\n\n")
+        if color_logos:
+            lines.extend(f"- **{logo}**\n" for logo in color_logos)
+        else:
+            lines.append("_No logos in this category._\n")
+        lines.append("\n---\n\n")
+
     with open(output_file, "w", encoding="utf-8") as f:
-        f.write("# Logo Main Color Analysis\n\n")
-        f.write("This document groups logos by their closest broad color category.\n\n")
-
-        for color, logos in color_groups.items():
-            f.write(f"## {color.capitalize()} Logos\n\n")
-            if logos:
-                for logo in logos:
-                    f.write(f"- **{logo}**\n")
-            else:
-                f.write("_No logos in this category._\n")
-            f.write("\n---\n\n")
+        f.write("".join(lines))
 
     print(f"Color analysis saved to `{output_file}`")
 
@@ -194,41 +315,44 @@ def display_color_analysis(csv_path, output_file="color_analysis.md"):
 
 def extract_main_colors(image_path, num_colors=5):
     """Uses K-Means clustering to extract the main colors in an image."""
+    pixels = _sample_pixels(image_path).astype(np.float32)
+
+    # OpenCV's K-Means is much faster than scikit-learn's for 3D color data
+    cv2.setRNGSeed(42)  # Seed the k-means++ initialization, so results are reproducible
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0)
+    _, _, centers = cv2.kmeans(pixels, num_colors, None, criteria, 3, cv2.KMEANS_PP_CENTERS)
+
+    colors = centers.astype(np.uint8)  # Convert float to integer RGB
+    return colors
+
+def _sample_pixels(image_path):
+    """Reads an image as an (N, 3) RGB array, keeping a random sample of pixels for large images."""
     image = cv2.imread(image_path)
     image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
     pixels = image.reshape(-1, 3)
 
-    kmeans = KMeans(n_clusters=num_colors, random_state=42)
-    kmeans.fit(pixels)
-
-    colors = kmeans.cluster_centers_.astype(int)  # Convert float to integer RGB
-    return colors
+    # A random sample of pixels is enough to find the main colors of a logo
+    if pixels.shape[0] > MAX_CLUSTER_PIXELS:
+        sample = np.random.default_rng(42).choice(pixels.shape[0], MAX_CLUSTER_PIXELS, replace=False)
+        pixels = pixels[sample]
+    return np.ascontiguousarray(pixels)
 
 def describe_logo_colors(rgb_colors):
     """Receives a list of RGB colors and decides whether a logo is minimalist or not."""
-    color_counts = Counter(closest_broad_color(tuple(rgb)) for rgb in rgb_colors)
-
-    # Get the two most dominant colors
-    color_groups = color_counts.most_common(8)
+    color_counts = np.bincount(closest_broad_color_batch(rgb_colors), minlength=len(_BROAD_NAMES))
 
-    if len(color_groups) <= 2:
-        return True
-
-    return False
+    # Minimalist logos use at most two broad colors
+    return int((color_counts > 0).sum()) <= 2
 
 # Helper functions for behavioral analysis
 
 def analyze_emotion(image_path):
     """Determines the emotion evoked by the dominant colors in the logo."""
     rgb_list = extract_main_colors(image_path)
-    color_counts = Counter(closest_broad_color(tuple(rgb)) for rgb in rgb_list)
-
-    # Get the most dominant colors
-    color_groups = color_counts.most_common(8)
+    color_counts = np.bincount(closest_broad_color_batch(rgb_list), minlength=len(_BROAD_NAMES))
 
     # Calculate the overall warmth of the logo
-    warmth_score = sum(COLOR_WARMTH[color] * count for color, count in color_groups)
-    warmth_score /= len(color_groups)
+    warmth_score = (color_counts * _BROAD_WARMTH).sum() / max(1, (color_counts > 0).sum())
 
     if warmth_score > 0.5:
         return "Energetic & Passionate"
@@ -246,31 +370,30 @@ def get_color_palette(image_name, output_folder, num_colors=5):
     """Generates a color palette from an image using K-Means clustering."""
     image_path = os.path.join("logos", image_name)
     colors = extract_main_colors(image_path)
-    colors = [tuple(color) for color in colors]
-
-    # Sort colors
-    colors.sort(key=lambda x: step(x[0], x[1], x[2], 8))
+    colors = sort_colors(colors, 8)
 
     # Create palette image
-    pil_img = Image.open(image_path)
-    width, height = pil_img.size
+    with Image.open(image_path) as pil_img:
+        width, height = pil_img.size
     palette_height = height // 6  # Adjust palette height relative to image
 
-    palette = Image.new('RGB', (width, palette_height), (255, 255, 255))
+    palette = np.full((palette_height, width, 3), 255, dtype=np.uint8)
     color_block_width = width // num_colors
 
-    # Draw color blocks without text
-    x_offset = 0
-    for color in colors:
-        new_img = Image.new('RGB', (color_block_width, palette_height), color)
-        palette.paste(new_img, (x_offset, 0))
-        x_offset += color_block_width
+    # Fill color blocks without text, each one is a single broadcast write
+    for i, color in enumerate(colors):
+        palette[:, i * color_block_width:(i + 1) * color_block_width] = color
 
     # Save the palette as a separate image
-    palette.save(os.path.join(output_folder, image_name))
-
-def step(r, g, b, repetitions=1):
-    """Sorts colors for better visualization."""
-    lum = math.sqrt(0.241 * r + 0.691 * g + 0.068 * b)
-    h, s, v = colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
-    return int(h * repetitions), int(lum * repetitions), int(v * repetitions)
\ No newline at end of file
+    Image.fromarray(palette).save(os.path.join(output_folder, image_name))
+
+def sort_colors(colors, repetitions=1):
+    """Sorts colors for better visualization, by hue, then luminance, then value."""
+    rgb = np.asarray(colors, dtype=np.float64).reshape(-1, 3)
+    hsv = rgb_to_hsv(rgb / 255.0)
+    lum = np.sqrt(0.241 * rgb[:, 0] + 0.691 * rgb[:, 1] + 0.068 * rgb[:, 2])
+
+    hue_key = (hsv[:, 0] * repetitions).astype(int)
+    lum_key = (lum * repetitions).astype(int)
+    value_key = (hsv[:, 2] * repetitions).astype(int)
+    return np.asarray(colors).reshape(-1, 3)[np.lexsort((value_key, lum_key, hue_key))]
\ No newline at end of file
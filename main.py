@@ -1,74 +1,100 @@
 import argparse
+import asyncio
 import concurrent.futures
+import functools
 import os
 import shutil
 import warnings
 from collections import defaultdict
-from threading import Lock
 
 import pandas as pd
 from PIL import Image
 
 import functions
 
-# Global dictionary for storing hashes (thread-safe)
+# Global dictionary mapping integer image hashes to logo paths (only touched from the event loop)
 hashes = {}
-hash_lock = Lock()
 
-def process_logo(domain, output_folder):
+async def process_logo(session, semaphore, executor, domain, output_folder):
     """Downloads a logo and checks for duplicates using the hash created from the image."""
     logo_path = os.path.join(output_folder, f"{domain.split(".")[0]}.png")
 
-    # Download logo
-    functions.download_logo(domain)
+    # Download logo (might have failed)
+    async with semaphore:
+        data = await functions.download_logo_bytes(session, domain)
+    if not data:
+        return
 
-    # Check if file exists (download might have failed)
-    if not os.path.exists(logo_path):
+    # Decode and hash the image in another process, so the event loop keeps downloading.
+    # Duplicates and corrupted images never touch the disk.
+    loop = asyncio.get_running_loop()
+    hash_value = await loop.run_in_executor(executor, functions.hash_logo_bytes, data)
+    if hash_value is None:
         return
 
-    try:
-        with Image.open(logo_path) as img:
-            hash_value = functions.dhash(img)
+    # No await between the check and the insert, so no other download can interleave
+    if hash_value in hashes:
+        return
+    hashes[hash_value] = logo_path
 
-        # Thread-safe check for duplicate images
-        with hash_lock:
-            if hash_value in hashes:
-                os.remove(logo_path)
-            else:
-                hashes[hash_value] = logo_path
+    with open(logo_path, "wb") as file:
+        file.write(data)
+    print(f"Downloaded: {logo_path}")
 
-    except Exception:
-        os.remove(logo_path)  # Remove corrupted images
+async def process_logos(domains, output_folder):
+    """Downloads all logos concurrently on a single event loop."""
+    semaphore = asyncio.Semaphore(functions.MAX_CONCURRENT_DOWNLOADS)
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        async with functions.create_download_session() as session:
+            # One failing site must not abort the others, so errors are collected instead of raised
+            await asyncio.gather(*(process_logo(session, semaphore, executor, domain, output_folder)
+                                   for domain in domains), return_exceptions=True)
 
 def move_similar_logos(output_folder):
-    """Moves similar logos to a separate folder using histogram similarity."""
+    """Moves similar logos to a separate folder using perceptual hash distance and histogram similarity."""
     duplicates_folder = "duplicates"
     os.makedirs(duplicates_folder, exist_ok=True)
 
-    checked_files = set()
     files = os.listdir(output_folder)
 
+    # Reuse the hashes computed while downloading, hash any logo that is missing
+    known_hashes = {os.path.basename(path): hash_value for hash_value, path in hashes.items()}
+    file_hashes = {}
+    for filename in files:
+        if filename in known_hashes:
+            file_hashes[filename] = known_hashes[filename]
+        else:
+            try:
+                with Image.open(os.path.join(output_folder, filename)) as img:
+                    file_hashes[filename] = functions.dhash(img)
+            except Exception:
+                pass
+
+    # Only logos sharing the first 3 chars of their name can belong to the same brand
+    buckets = defaultdict(list)
+    for filename in sorted(file_hashes):
+        buckets[filename[:3]].append(filename)
+
     def check_similarity(image1, image2):
-        """Compare images and move duplicates."""
+        """Confirm a near-duplicate candidate by histogram and move it."""
         file1_path = os.path.join(output_folder, image1)
         file2_path = os.path.join(output_folder, image2)
 
         try:
             similarity = functions.calculate_histogram_similarity(file1_path, file2_path)
-            if similarity > 49 and image1[:3] == image2[:3]:  # Check first 3 chars for brand match
+            if similarity > 49:
                 print(f"Duplicate detected: {image2} ({similarity:.2f}%) -> Moving to {duplicates_folder}")
                 shutil.move(file2_path, os.path.join(duplicates_folder, image2))
         except Exception as e:
             pass
 
-    # Use ThreadPoolExecutor to speed up comparison
+    # Only logos whose hashes differ in fewer than 10 bits are compared by histogram
     with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        for i, file1 in enumerate(files):
-            if file1 in checked_files:
-                continue
-            for file2 in files[i + 1 :]:
-                executor.submit(check_similarity, file1, file2)
-            checked_files.add(file1)
+        for group in buckets.values():
+            for i, file1 in enumerate(group):
+                for file2 in group[i + 1 :]:
+                    if functions.hamming_distance(file_hashes[file1], file_hashes[file2]) < 10:
+                        executor.submit(check_similarity, file1, file2)
 
 def delete_corrupted_images(output_folder):
     """Deletes corrupted images from the logos folder."""
@@ -99,9 +125,8 @@ def download_logos():
     os.makedirs(output_folder, exist_ok=True)
     print("Starting logo download...")
 
-    # Use ThreadPoolExecutor for faster downloads
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        executor.map(lambda site: process_logo(site, output_folder), selected_domains)
+    # Downloads are IO bound, so they run concurrently on an asyncio event loop
+    asyncio.run(process_logos(selected_domains, output_folder))
 
     print("Finished logo download.")
     print("Checking for duplicates...")
@@ -112,34 +137,49 @@ def download_logos():
 
     print("Duplicate check completed.")
 
+def analyze_logo(filepath, method):
+    """Analyzes a single logo; runs in a worker process, so it must stay at module level."""
+    filename = os.path.basename(filepath)
+    try:
+        with Image.open(filepath) as img:
+            if method == "color":
+                main_color = functions.get_main_color(filepath)
+                if main_color is not None:
+                    return filename, main_color
+            elif method == "minimalism":
+                rgb_colors = functions.extract_main_colors(filepath)
+                is_minimalist = functions.describe_logo_colors(rgb_colors)
+                return filename, is_minimalist
+            elif method == "emotion":
+                emotion = functions.analyze_emotion(filepath)
+                return filename, emotion
+    except Exception as e:
+        pass
+    return None
+
 def analyze_logos(method):
     """Analyze logos and categorize them based on color, minimalism, or emotion."""
     print(f"Starting analysis on {method} criteria...")
     input_folder = "logos"
-    analysis_results = []
+    filepaths = [os.path.join(input_folder, filename) for filename in os.listdir(input_folder)]
 
-    for filename in os.listdir(input_folder):
-        filepath = os.path.join(input_folder, filename)
-        try:
-            with Image.open(filepath) as img:
-                if method == "color":
-                    main_color = functions.get_main_color(filepath)
-                    _, color_group = functions.get_colour_name(main_color)
-                    analysis_results.append((filename, main_color, color_group))
-                elif method == "minimalism":
-                    rgb_colors = functions.extract_main_colors(filepath)
-                    is_minimalist = functions.describe_logo_colors(rgb_colors)
-                    analysis_results.append((filename, is_minimalist))
-                elif method == "emotion":
-                    emotion = functions.analyze_emotion(filepath)
-                    analysis_results.append((filename, emotion))
-        except Exception as e:
-            pass
+    # The analysis is CPU bound, so logos are spread over processes instead of threads
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        results = executor.map(functools.partial(analyze_logo, method=method), filepaths, chunksize=8)
+        analysis_results = [result for result in results if result is not None]
+
+    # Name all main colors with a single nearest-color query
+    if method == "color" and analysis_results:
+        color_groups = functions.closest_colours_batch([main_color for _, main_color in analysis_results])
+        analysis_results = [(filename, main_color, color_group)
+                            for (filename, main_color), color_group in zip(analysis_results, color_groups)]
 
     # Save results
     if method == "color":
         results_df = pd.DataFrame(analysis_results, columns=["Logo", "Main_Color_RGB", "Color_Group"])
-        functions.display_color_analysis("analysis_color.csv")
+        # The main colors are still in memory, so they are grouped without parsing the csv back
+        main_colors = [main_color for _, main_color, _ in analysis_results]
+        functions.write_color_analysis(results_df["Logo"], main_colors)
     elif method == "minimalism":
         results_df = pd.DataFrame(analysis_results, columns=["Logo", "Minimalist?"])
     else: